@@ -1,3 +1,4 @@
+import asyncio
 import hmac
 import logging
 import os
@@ -76,13 +77,13 @@ class AuthHandler:
         return config.initialized and bool(config.panel_password)
 
     def _cleanup_expired_tokens(self):
-        now = time.time()
+        now = time.monotonic()
         expired = [token for token, exp in self._tokens.items() if exp <= now]
         for token in expired:
             self._tokens.pop(token, None)
 
     def _can_attempt_login(self, client_ip: str) -> bool:
-        now = time.time()
+        now = time.monotonic()
         attempts = self._failed_attempts_by_ip.setdefault(client_ip, deque())
         while attempts and now - attempts[0] > self._attempt_window_seconds:
             attempts.popleft()
@@ -90,13 +91,13 @@ class AuthHandler:
 
     def _record_failed_attempt(self, client_ip: str):
         attempts = self._failed_attempts_by_ip.setdefault(client_ip, deque())
-        attempts.append(time.time())
+        attempts.append(time.monotonic())
 
     def create_token(self) -> str:
         """Generate a session token."""
         self._cleanup_expired_tokens()
         token = secrets.token_hex(32)
-        self._tokens[token] = time.time() + self._token_ttl_seconds
+        self._tokens[token] = time.monotonic() + self._token_ttl_seconds
         return token
 
     def revoke_token(self, token: str):
@@ -124,7 +125,12 @@ class AuthHandler:
         self._tokens.clear()
         return removed
 
-    def authenticate(self, password: str, client_ip: str = "unknown") -> str:
+    async def authenticate(self, password: str, client_ip: str = "unknown") -> str:
+        """Check the password and issue a token.
+
+        Throttle and token bookkeeping stay on the event loop; only the bcrypt
+        work runs in a worker thread.
+        """
         config = ConfigManager.get_instance()
         if not config.initialized:
             raise HTTPException(status_code=400, detail="Panel is not initialized yet")
@@ -134,14 +140,17 @@ class AuthHandler:
         if not self._can_attempt_login(client_ip):
             raise HTTPException(status_code=429, detail="Too many login attempts. Please retry later.")
 
-        if not self.verify_password(password):
-            self._record_failed_attempt(client_ip)
+        # Count the attempt before yielding to bcrypt, so concurrent guesses
+        # from one IP cannot all pass the check above; cleared on success.
+        self._record_failed_attempt(client_ip)
+        if not await asyncio.to_thread(self.verify_password, password):
             raise HTTPException(status_code=401, detail="Invalid password")
 
         # Safety net migration in case a plaintext password reappears.
         if not self._is_bcrypt_hash(config.panel_password):
             try:
-                config.set("panel_password", self.hash_password(config.panel_password))
+                hashed = await asyncio.to_thread(self.hash_password, config.panel_password)
+                config.set("panel_password", hashed)
                 logger.info("Migrated plaintext password after successful login")
             except Exception as e:
                 logger.warning(f"Failed to migrate plaintext password after login: {e}")
@@ -1,11 +1,46 @@
 import asyncio
 import logging
+import os
 import httpx
 from abc import ABC, abstractmethod
-from typing import Dict, Optional, Union, List
+from contextlib import suppress
+from typing import Awaitable, Callable, Dict, Optional, Sequence
 
 logger = logging.getLogger(__name__)
 
+_PIPE = asyncio.subprocess.PIPE
+_DEVNULL = asyncio.subprocess.DEVNULL
+_PROC_NET_TCP = ("/proc/net/tcp", "/proc/net/tcp6")
+_TCP_LISTEN = "0A"
+_CF_TRACE_URL = "https://www.cloudflare.com/cdn-cgi/trace"
+_S6_ENV_DIR = "/var/run/s6/container_environment"
+
+class _IPClientPool:
+    """httpx clients (keyed by proxy URL, "" = direct) shared by lookups of one status version"""
+
+    __slots__ = ("clients", "users", "retired")
+
+    def __init__(self):
+        self.clients: Dict[str, httpx.AsyncClient] = {}
+        self.users = 0
+        self.retired = False
+
+    def get(self, proxy_url: str) -> httpx.AsyncClient:
+        client = self.clients.get(proxy_url)
+        if client is None:
+            client = httpx.AsyncClient(proxy=proxy_url or None, timeout=8.0)
+            self.clients[proxy_url] = client
+        return client
+
+    async def aclose(self):
+        clients, self.clients = self.clients, {}
+        for client in clients.values():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.debug(f"Error closing IP lookup client: {e}")
+
+
 class WarpBackendController(ABC):
     """
     Abstract base class for WARP backend controllers.
@@ -15,12 +50,65 @@ class WarpBackendController(ABC):
     _status_cache: Optional[Dict] = None
     _status_cache_time: float = 0
     _STATUS_CACHE_TTL: float = 2.0
+    # Past the soft TTL (but within this) callers get the cached status at once
+    # while a background refresh runs; only older entries make callers wait.
+    _STATUS_CACHE_HARD_TTL: float = 30.0
+
+    # Values this process last wrote (or found) in the s6 env store, by key
+    _s6_env_written: Dict[str, str] = {}
+
+    # How long a subclass may reuse its last liveness/connection probe
+    _PROBE_TTL: float = 0.5
+
+    # wait_for_status backoff: quick first probes, then settle at one probe per second
+    _POLL_INITIAL: float = 0.05
+    _POLL_FACTOR: float = 1.6
+    _POLL_MAX: float = 1.0
+
+    # IP lookup sources, tried in order
+    _IP_APIS = (
+        "http://ip-api.com/json/?fields=status,message,query,country,city,isp",
+        "https://ipinfo.io/json",
+        _CF_TRACE_URL,
+    )
+    _status_inflight: Optional[asyncio.Task] = None
+    _status_version: int = 0
+
+    # Set whenever a backend changes state; consumed by the websocket broadcaster.
+    status_changed = asyncio.Event()
 
     def __init__(self, socks5_port: int = 1080):
         self.socks5_port = socks5_port
         self._cached_ip_info: Optional[Dict] = None
         self._cache_time: float = 0
         self._cache_ttl: float = 120  # Cache IP info for 120 seconds
+        # Static part of every status payload; _get_status_uncached copies it and
+        # fills in the fields that can change (key order is the payload order)
+        self._status_proto: Dict = {
+            "backend": type(self).__name__.replace("Controller", "").lower(),
+            "status": "disconnected",
+            "ip": "Unknown",
+            "location": "Unknown",
+            "city": "Unknown",
+            "country": "Unknown",
+            "isp": "Cloudflare WARP",
+            "warp_protocol": "MASQUE", # Default, override in subclass if dynamic
+            "warp_mode": "proxy",
+            "connection_time": "Unknown",
+            "network_type": "Unknown",
+            "proxy_address": "",
+            "details": {},
+        }
+        # Last connection probe, (loop time, ...result); shape is up to the subclass
+        self._probe_cache: Optional[tuple] = None
+        # Pooled IP-lookup clients; replaced whenever the status version moves so
+        # a new exit never reuses old tunnels. The old pool is closed once the
+        # lookups still holding it finish.
+        self._ip_pool = _IPClientPool()
+        self._ip_pool_version: int = -1
+        # In-flight IP lookup shared by concurrent status builds of the same version
+        self._ip_fetch_task: Optional[asyncio.Task] = None
+        self._ip_fetch_version: int = -1
 
     @property
     @abstractmethod
@@ -44,81 +132,153 @@ class WarpBackendController(ABC):
         pass
 
     @staticmethod
-    async def _run_command(command: Union[str, List[str]], timeout=None):
-        """Run a shell command or executable"""
+    async def _communicate(process, timeout):
         try:
-            if isinstance(command, list):
-                process = await asyncio.create_subprocess_exec(
-                    *command,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-            else:
-                process = await asyncio.create_subprocess_shell(
-                    command,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
             stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
-            return process.returncode, stdout.decode().strip(), stderr.decode().strip()
         except asyncio.TimeoutError:
-            logger.error(f"Command '{command}' timed out")
+            # Don't leave a hung warp-cli/s6 child (and its pipes) behind
+            with suppress(ProcessLookupError):
+                process.kill()
+            await process.wait()
+            raise
+        return (
+            process.returncode,
+            stdout.decode().strip() if stdout is not None else "",
+            stderr.decode().strip() if stderr is not None else "",
+        )
+
+    @classmethod
+    async def _run_exec(
+        cls,
+        argv: Sequence[str],
+        timeout=None,
+        capture_stdout: bool = True,
+        capture_stderr: bool = True,
+    ):
+        """Run an executable directly (no intermediate shell).
+
+        Streams not captured go to /dev/null and come back as ""; callers that
+        only look at the return code skip both pipes and their decoding.
+        """
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *argv,
+                stdout=_PIPE if capture_stdout else _DEVNULL,
+                stderr=_PIPE if capture_stderr else _DEVNULL,
+            )
+            return await cls._communicate(process, timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Command '{' '.join(argv)}' timed out")
             return -1, "", "Timeout"
         except Exception as e:
-            logger.error(f"Error executing '{command}': {e}")
+            logger.error(f"Error executing '{' '.join(argv)}': {e}")
             return -1, "", str(e)
 
-    async def _is_port_open(self, port: int) -> bool:
-        """Check if a local port is listening using 'ss'"""
+    @classmethod
+    def _write_s6_env(cls, key: str, value: str) -> None:
+        """Persist an env var into the s6 container environment store (skipped when unchanged)."""
+        if cls._s6_env_written.get(key) == value:
+            return
+        path = os.path.join(_S6_ENV_DIR, key)
+        try:
+            with open(path) as f:
+                if f.read() == value:
+                    cls._s6_env_written[key] = value
+                    return
+        except OSError:
+            pass
         try:
-            rc, stdout, _ = await self._run_command(f"ss -lnt sport = :{port}")
-            return f":{port}" in stdout
-        except (OSError, asyncio.SubprocessError):
-            return False
+            os.makedirs(_S6_ENV_DIR, exist_ok=True)
+            with open(path, "w") as f:
+                f.write(value)
+            cls._s6_env_written[key] = value
+        except OSError:
+            pass
+
+    @staticmethod
+    async def _is_port_open(port: int) -> bool:
+        """Check if a local TCP port is listening (what `ss -lnt` reports, without the fork)"""
+        suffix = f":{port:04X}"
+        for path in _PROC_NET_TCP:
+            try:
+                with open(path) as f:
+                    next(f, None)  # header
+                    for line in f:
+                        # sl, local_address, rem_address, st, ...
+                        fields = line.split(None, 4)
+                        if len(fields) > 3 and fields[3] == _TCP_LISTEN and fields[1].endswith(suffix):
+                            return True
+            except OSError:
+                continue
+        return False
 
     async def get_status(self) -> Dict:
         """Get connection status and IP information (with short-term caching)"""
         now = asyncio.get_running_loop().time()
-        if (
-            self._status_cache is not None
-            and now - self._status_cache_time < self._STATUS_CACHE_TTL
-        ):
-            return self._status_cache
+        cached = self._status_cache
+        age = now - self._status_cache_time
+        if cached is not None and age < self._STATUS_CACHE_TTL:
+            return cached
 
-        status = await self._get_status_uncached()
-        self._status_cache = status
-        self._status_cache_time = now
-        return status
+        # Concurrent callers on a cache miss share one probe
+        task = self._status_inflight
+        if task is None:
+            task = asyncio.ensure_future(self._refresh_status())
+            # Retrieve the exception even when nobody ends up awaiting the refresh
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._status_inflight = task
+
+        if cached is not None and age < self._STATUS_CACHE_HARD_TTL:
+            return cached
+        return await asyncio.shield(task)
+
+    async def _refresh_status(self) -> Dict:
+        version = self._status_version
+        started = asyncio.get_running_loop().time()
+        try:
+            status = await self._get_status_uncached()
+            # Don't cache a result that an invalidation raced past
+            if version == self._status_version:
+                previous = self._status_cache
+                self._status_cache = status
+                self._status_cache_time = started
+                if previous is not None and previous != status:
+                    # Someone may have been served the stale copy; push the change
+                    WarpBackendController.status_changed.set()
+            return status
+        finally:
+            if self._status_inflight is asyncio.current_task():
+                self._status_inflight = None
 
     def _invalidate_status_cache(self):
+        """Drop every cached view of the connection, IP info included (a new exit has a new IP)"""
         self._status_cache = None
         self._status_cache_time = 0
+        self._cached_ip_info = None
+        self._cache_time = 0
+        self._probe_cache = None
+        self._status_version += 1
+        self._status_inflight = None
+        WarpBackendController.status_changed.set()
 
     async def _get_status_uncached(self) -> Dict:
         """
         Construct status dictionary. 
         Subclasses can override, but this provides a solid default structure.
         """
+        # IP info learned after an invalidation belongs to the previous exit
+        version = self._status_version
         connected = await self.is_connected()
-        
-        base_status = {
-            "backend": self.__class__.__name__.replace("Controller", "").lower(), # efficient enough
-            "status": "connected" if connected else "disconnected",
-            "ip": "Unknown",
-            "location": "Unknown",
-            "city": "Unknown",
-            "country": "Unknown",
-            "isp": "Cloudflare WARP",
-            "warp_protocol": "MASQUE", # Default, override in subclass if dynamic
-            "warp_mode": self.mode,
-            "connection_time": "Unknown",
-            "network_type": "Unknown",
-            "proxy_address": f"socks5://127.0.0.1:{self.socks5_port}",
-            "details": {},
-        }
+
+        base_status = self._status_proto.copy()
+        base_status["status"] = "connected" if connected else "disconnected"
+        base_status["warp_mode"] = self.mode
+        base_status["proxy_address"] = f"socks5://127.0.0.1:{self.socks5_port}"
+        base_status["details"] = {}
 
         if not connected:
-            self._cached_ip_info = None
+            if version == self._status_version:
+                self._cached_ip_info = None
             return base_status
 
         now = asyncio.get_running_loop().time()
@@ -126,22 +286,27 @@ class WarpBackendController(ABC):
             base_status.update(self._cached_ip_info)
             return base_status
 
-        ip_info = await self._fetch_ip_info()
+        ip_info = await self._fetch_ip_info_shared()
         if ip_info:
-            self._cached_ip_info = ip_info
-            self._cache_time = now
+            if version == self._status_version:
+                self._cached_ip_info = ip_info
+                self._cache_time = now
             base_status.update(ip_info)
         elif self._cached_ip_info:
             base_status.update(self._cached_ip_info)
 
         return base_status
 
-    async def _fetch_from_apis(self, client: httpx.AsyncClient, apis: List[str]) -> Optional[Dict]:
+    async def _fetch_from_apis(self, client: httpx.AsyncClient, apis: Sequence[str]) -> Optional[Dict]:
         for api_url in apis:
             try:
                 response = await client.get(api_url)
                 response.raise_for_status()
-                data = response.json()
+                if api_url == _CF_TRACE_URL:
+                    # Plain "key=value" lines rather than JSON
+                    data = dict(line.split("=", 1) for line in response.text.splitlines() if "=" in line)
+                else:
+                    data = response.json()
                 result = self._parse_ip_data(data, api_url)
                 if result:
                     return result
@@ -151,36 +316,73 @@ class WarpBackendController(ABC):
                 logger.warning(f"Error parsing IP info ({api_url}): {e}")
         return None
 
+    async def _fetch_ip_info_shared(self) -> Optional[Dict]:
+        """Single-flight wrapper: join a running lookup unless the state changed since it began"""
+        version = self._status_version
+        task = self._ip_fetch_task
+        if task is None or task.done() or self._ip_fetch_version != version:
+            task = asyncio.ensure_future(self._fetch_ip_info())
+            self._ip_fetch_task = task
+            self._ip_fetch_version = version
+        result = await asyncio.shield(task)
+        # The exit may have changed while the lookup ran; its answer is for the old one
+        if version != self._status_version:
+            return None
+        return result
+
     async def _fetch_ip_info(self) -> Optional[Dict]:
         """Fetch IP info via SOCKS5 proxy using httpx, with direct fallback"""
-        apis = [
-            "http://ip-api.com/json/?fields=status,message,query,country,city,isp",
-            "https://ipinfo.io/json",
-            "https://ifconfig.me/all.json"
-        ]
-        
+        apis = self._IP_APIS
         proxy_url = f"socks5h://127.0.0.1:{self.socks5_port}"
-        
-        # Try via SOCKS5 proxy first
+        pool = await self._acquire_ip_pool()
         try:
-            async with httpx.AsyncClient(proxy=proxy_url, timeout=8.0) as client:
+            # Try via SOCKS5 proxy first
+            try:
+                client = pool.get(proxy_url)
                 result = await self._fetch_from_apis(client, apis)
                 if result:
                     return result
-        except Exception as e:
-            logger.warning(f"Failed to create proxy client (socks5 port {self.socks5_port}): {e}")
-        
-        # Fallback: try direct connection (useful for TUN mode or when socat isn't ready)
-        try:
-            async with httpx.AsyncClient(timeout=8.0) as client:
+            except Exception as e:
+                logger.warning(f"Failed to create proxy client (socks5 port {self.socks5_port}): {e}")
+
+            # Fallback: try direct connection (useful for TUN mode or when socat isn't ready)
+            try:
+                client = pool.get("")
                 result = await self._fetch_from_apis(client, apis)
                 if result:
                     logger.info(f"IP info fetched via direct connection")
                     return result
-        except Exception as e:
-            logger.warning(f"Direct IP info fetch also failed: {e}")
-                
-        return None
+            except Exception as e:
+                logger.warning(f"Direct IP info fetch also failed: {e}")
+
+            return None
+        finally:
+            await self._release_ip_pool(pool)
+
+    async def _acquire_ip_pool(self) -> _IPClientPool:
+        """Pin the client pool of the current status version for one lookup"""
+        if self._ip_pool_version != self._status_version:
+            old, self._ip_pool = self._ip_pool, _IPClientPool()
+            self._ip_pool_version = self._status_version
+            old.retired = True
+            if not old.users:
+                await old.aclose()
+        pool = self._ip_pool
+        pool.users += 1
+        return pool
+
+    async def _release_ip_pool(self, pool: _IPClientPool):
+        pool.users -= 1
+        if pool.retired and not pool.users:
+            await pool.aclose()
+
+    async def close(self):
+        """Release pooled HTTP connections (deferred while a lookup still uses them)"""
+        old, self._ip_pool = self._ip_pool, _IPClientPool()
+        self._ip_pool_version = -1
+        old.retired = True
+        if not old.users:
+            await old.aclose()
 
     @staticmethod
     def _parse_ip_data(data: Dict, api_url: str) -> Dict:
@@ -205,28 +407,53 @@ class WarpBackendController(ABC):
                 "isp": data.get("org") or "Cloudflare WARP",
                 "details": {"isp": data.get("org")},
             }
-        elif "ifconfig.me" in api_url:
-             return {
-                "ip": data.get("ip_addr") or "Unknown",
-                "country": "Unknown",
+        elif api_url == _CF_TRACE_URL:
+            # Served by Cloudflare's own edge: country code and colo, no city
+            if not data.get("ip"):
+                return {}
+            return {
+                "ip": data["ip"],
+                "country": data.get("loc") or "Unknown",
                 "city": "Unknown",
-                "location": "Unknown",
+                "location": data.get("loc") or "Unknown",
                 "isp": "Cloudflare WARP",
-                "details": {},
+                "details": {"colo": data.get("colo"), "warp": data.get("warp")},
             }
         return {}
 
-    async def wait_for_status(self, target_status: str, timeout: int = 15) -> bool:
-        """Poll for status change"""
-        start_time = asyncio.get_running_loop().time()
-        while asyncio.get_running_loop().time() - start_time < timeout:
-            connected = await self.is_connected()
-            if target_status == "connected" and connected:
-                self._invalidate_status_cache()
-                return True
-            elif target_status == "disconnected" and not connected:
-                self._invalidate_status_cache()
+    @staticmethod
+    async def _await_condition(
+        pred: Callable[[], Awaitable[bool]],
+        timeout: float,
+        initial: float = 0.1,
+        max_delay: float = 0.5,
+        factor: float = 1.5,
+    ) -> bool:
+        """Poll an async predicate with exponential backoff until it holds or timeout passes"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay = initial
+        while True:
+            if await pred():
                 return True
-            await asyncio.sleep(1)
-        return False
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * factor, max_delay)
 
+    async def wait_for_status(self, target_status: str, timeout: int = 15) -> bool:
+        """Poll for status change with exponential backoff between probes"""
+        want_connected = target_status == "connected"
+
+        async def reached() -> bool:
+            # Each backoff step must see a fresh probe, not the _PROBE_TTL memo
+            self._probe_cache = None
+            return await self.is_connected() == want_connected
+
+        if await self._await_condition(
+            reached, timeout, self._POLL_INITIAL, self._POLL_MAX, self._POLL_FACTOR
+        ):
+            self._invalidate_status_cache()
+            return True
+        return False
@@ -3,7 +3,7 @@ import logging
 import os
 import sqlite3
 import threading
-from typing import Any
+from typing import Any, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +23,8 @@ class ConfigManager:
         self._db_path = os.path.join(data_dir, "config.db")
         self._legacy_config_path = os.path.join(data_dir, "config.json")
         self._lock = threading.RLock()
+        # Serialized values by key (None = absent); this process is the only writer.
+        self._cache: Dict[str, Optional[str]] = {}
         self._init_db()
         self._migrate_legacy_json_if_needed()
         self._seed_defaults()
@@ -93,11 +95,15 @@ class ConfigManager:
 
     def get(self, key: str, default: Any = None):
         with self._lock:
-            with self._connect() as conn:
-                row = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
-        if not row:
+            if key in self._cache:
+                raw_value = self._cache[key]
+            else:
+                with self._connect() as conn:
+                    row = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+                raw_value = row[0] if row else None
+                self._cache[key] = raw_value
+        if raw_value is None:
             return default
-        raw_value = row[0]
         try:
             return json.loads(raw_value)
         except json.JSONDecodeError:
@@ -115,6 +121,7 @@ class ConfigManager:
                     (key, serialized),
                 )
                 conn.commit()
+            self._cache[key] = serialized
 
     # Convenience accessors
     @property
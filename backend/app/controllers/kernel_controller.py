@@ -14,8 +14,13 @@ from .config_controller import ConfigManager
 
 logger = logging.getLogger(__name__)
 
+# Version strings printed by `<binary> version`
+_VERSION_OUTPUT_RE = re.compile(r'(?:version\s+)?v?(\d+\.\d+\.\d+(?:\.\d+)?)', re.IGNORECASE)
+_SEMVER_RE = re.compile(r'v?(\d+\.\d+\.\d+)')
+
 class KernelVersionManager:
     _instance = None
+    _warp_cli_path: Optional[str] = None  # "" once resolved as missing
     
     def __init__(self):
         # Base directory for data
@@ -63,14 +68,22 @@ class KernelVersionManager:
             
         return sorted(versions, reverse=True)
 
+    @classmethod
+    def _resolve_warp_cli(cls) -> str:
+        """Resolve warp-cli on PATH once; the system install does not move at runtime."""
+        if cls._warp_cli_path is None:
+            cls._warp_cli_path = shutil.which("warp-cli") or ""
+        return cls._warp_cli_path
+
     def get_active_version(self, backend: str) -> Optional[str]:
         """Get the currently selected version for a backend"""
         if backend == "official":
-            if shutil.which("warp-cli") is None:
+            warp_cli = self._resolve_warp_cli()
+            if not warp_cli:
                 return "Not Installed"
             try:
                 # Try to get real version
-                result = subprocess.run(["warp-cli", "--version"], capture_output=True, text=True, timeout=2)
+                result = subprocess.run([warp_cli, "--version"], capture_output=True, text=True, timeout=2)
                 if result.returncode == 0:
                     return result.stdout.strip()
             except (subprocess.SubprocessError, FileNotFoundError):
@@ -163,7 +176,7 @@ class KernelVersionManager:
             if result.returncode == 0:
                 output = result.stdout.strip()
                 # Simplified regex matching
-                match = re.search(r'(?:version\s+)?v?(\d+\.\d+\.\d+(?:\.\d+)?)', output, re.IGNORECASE)
+                match = _VERSION_OUTPUT_RE.search(output)
                 if match:
                     version_info["version"] = match.group(1)
                 else:
@@ -354,7 +367,7 @@ class KernelVersionManager:
             result = subprocess.run(cmd, capture_output=True, text=True, timeout=2)
             if result.returncode == 0:
                 output = result.stdout.strip()
-                match = re.search(r'v?(\d+\.\d+\.\d+)', output)
+                match = _SEMVER_RE.search(output)
                 if match:
                     version = match.group(1)
                     logger.info(f"Detected system version: {version}")
@@ -6,17 +6,33 @@ Supports proxy mode with MASQUE / WireGuard protocols
 import asyncio
 import logging
 import os
-from typing import Dict
+from typing import Dict, Tuple
 from .base_controller import WarpBackendController
 
 logger = logging.getLogger(__name__)
 
+_REG_JSON = "/var/lib/cloudflare-warp/reg.json"
+
+# Prebuilt argv for every warp-cli call the controller makes
+_WARP_CLI = ("warp-cli", "--accept-tos")
+_CMD_STATUS = _WARP_CLI + ("status",)
+_CMD_CONNECT = _WARP_CLI + ("connect",)
+_CMD_DISCONNECT = _WARP_CLI + ("disconnect",)
+_CMD_MODE_PROXY = _WARP_CLI + ("mode", "proxy")
+_CMD_PROXY_PORT = _WARP_CLI + ("proxy", "port", "40001")
+_CMD_PROTOCOL_MASQUE = _WARP_CLI + ("tunnel", "protocol", "set", "MASQUE")
+_CMD_REGISTRATION_NEW = _WARP_CLI + ("registration", "new")
+_CMD_REGISTRATION_DELETE = _WARP_CLI + ("registration", "delete")
+
+
 class OfficialController(WarpBackendController):
+    _registration_seen: bool = False  # positive reg.json check, cleared on delete/registration errors
 
     def __init__(self, socks5_port: int = 1080):
         super().__init__(socks5_port=socks5_port)
         self.mute_backend_logs = False
         self.preferred_protocol = "masque" 
+        # _probe_cache holds (loop time, daemon_up, connected) from the last `warp-cli status`
 
     @property
     def mode(self) -> str:
@@ -26,24 +42,66 @@ class OfficialController(WarpBackendController):
     # Low-level helpers
     # ------------------------------------------------------------------
 
-    async def execute_command(self, command: str):
-        """Execute warp-cli command"""
-        rc, stdout, stderr = await self._run_command(command, timeout=10)
+    async def execute_command(self, argv: Tuple[str, ...]):
+        """Execute a warp-cli command (one of the module's _CMD_* argv tuples)"""
+        self._probe_cache = None
+        rc, stdout, stderr = await self._run_exec(argv, timeout=10)
         if rc != 0:
-            logger.error(f"Command '{command}' failed: {stderr.strip()}")
+            logger.error(f"Command '{' '.join(argv)}' failed: {stderr.strip()}")
             return None
         return stdout.strip()
 
-    async def _is_daemon_responsive(self) -> bool:
-        """Check if warp-svc is running AND responsive"""
-        rc, stdout, _ = await self._run_command("s6-svstat -o up /run/service/warp-svc")
-        if rc != 0 or stdout.strip() != "true":
+    async def execute_command_quiet(self, argv: Tuple[str, ...]) -> bool:
+        """Run a warp-cli command whose output is not needed; True on success"""
+        self._probe_cache = None
+        rc, _, stderr = await self._run_exec(argv, timeout=10, capture_stdout=False)
+        if rc != 0:
+            logger.error(f"Command '{' '.join(argv)}' failed: {stderr}")
+            return False
+        return True
+
+    async def _probe_state(self) -> Tuple[bool, bool]:
+        """Return (daemon_up, connected) from a single `warp-cli status`, memoized briefly.
+
+        warp-cli only exits 0 when it can talk to warp-svc, so the return code
+        doubles as the liveness check and stdout carries the connection state.
+        """
+        now = asyncio.get_running_loop().time()
+        cached = self._probe_cache
+        if cached is not None and now - cached[0] < self._PROBE_TTL:
+            return cached[1], cached[2]
+
+        rc, stdout, _ = await self._run_exec(_CMD_STATUS, timeout=3)
+        daemon_up = rc == 0
+        output = stdout.lower()
+        connected = daemon_up and "connected" in output and "disconnected" not in output
+        self._probe_cache = (now, daemon_up, connected)
+        return daemon_up, connected
+
+    @classmethod
+    def _has_registration(cls) -> bool:
+        """reg.json exists; a positive answer is remembered until _forget_registration"""
+        if cls._registration_seen:
+            return True
+        try:
+            os.stat(_REG_JSON)
+        except OSError:
             return False
-        rc, _, _ = await self._run_command("warp-cli --accept-tos status", timeout=2)
-        return rc == 0
+        cls._remember_registration()
+        return True
+
+    @classmethod
+    def _remember_registration(cls) -> None:
+        cls._registration_seen = True
 
-    async def _check_daemon_running(self) -> bool:
-        return await self._is_daemon_responsive()
+    @classmethod
+    def _forget_registration(cls) -> None:
+        cls._registration_seen = False
+
+    async def _is_daemon_responsive(self) -> bool:
+        """Check if warp-svc is running AND responsive"""
+        daemon_up, _ = await self._probe_state()
+        return daemon_up
 
     # ------------------------------------------------------------------
     # Connect / Disconnect
@@ -55,37 +113,37 @@ class OfficialController(WarpBackendController):
 
     async def _connect_proxy(self) -> bool:
         """Connect in proxy mode"""
+        # Everything below mutates daemon state; nothing cached survives it
+        self._invalidate_status_cache()
+
         # Ensure registration exists first
-        if not os.path.exists("/var/lib/cloudflare-warp/reg.json"):
-            logger.info("No registration found, attempting to register...")
-            await self.execute_command("warp-cli --accept-tos registration new")
-            
-        if not await self._is_daemon_responsive():
+        await self._ensure_registration()
+
+        if await self._is_daemon_responsive():
+            await self._ensure_socat()
+            configured = False
+        else:
             logger.info("Daemon not ready, restarting services...")
             await self._stop_services()
+            # Starting also brings up socat and applies the proxy settings
             if not await self._start_services_proxy():
                 logger.error("Failed to start official WARP services (proxy)")
                 return False
-
-        await self._ensure_socat()
+            configured = True
 
         logger.info("Connecting WARP (official, proxy mode)...")
         
         # Reset mode first to ensure clean state
-        await self.execute_command("warp-cli --accept-tos disconnect")
+        await self.execute_command_quiet(_CMD_DISCONNECT)
         
-        # Configure
-        await self.execute_command("warp-cli --accept-tos mode proxy")
-        await self.execute_command("warp-cli --accept-tos proxy port 40001")
-        await self.execute_command("warp-cli --accept-tos tunnel protocol set MASQUE")
+        if not configured:
+            await self._apply_proxy_settings()
         
         # Connect
-        res = await self.execute_command("warp-cli --accept-tos connect")
+        res = await self.execute_command(_CMD_CONNECT)
         if res and "Error" in res:
              logger.error(f"Connect command returned error: {res}")
 
-        await asyncio.sleep(2)
-
         if await self.wait_for_status("connected", timeout=30): 
             self.mute_backend_logs = True
             self._invalidate_status_cache()
@@ -93,8 +151,11 @@ class OfficialController(WarpBackendController):
             return True
 
         # Diagnostic log
-        status = await self.execute_command("warp-cli --accept-tos status")
+        status = await self.execute_command(_CMD_STATUS)
         logger.error(f"Official WARP proxy connection failed. Status: {status}")
+        if any(out and "registration" in out.lower() for out in (res, status)):
+            # Registration was lost under us; re-check reg.json on the next connect
+            self._forget_registration()
         return False
 
 
@@ -104,7 +165,7 @@ class OfficialController(WarpBackendController):
         self._invalidate_status_cache()
 
         try:
-            await self.execute_command("warp-cli --accept-tos disconnect")
+            await self.execute_command_quiet(_CMD_DISCONNECT)
             await self.wait_for_status("disconnected", timeout=5)
         except Exception:
             pass
@@ -123,19 +184,17 @@ class OfficialController(WarpBackendController):
             logger.info("Starting background services (proxy mode)...")
             self.mute_backend_logs = False
 
-            rc, _, stderr = await self._run_command("s6-rc -u change warp-svc")
+            rc, _, stderr = await self._run_exec(("s6-rc", "-u", "change", "warp-svc"), capture_stdout=False)
+            self._probe_cache = None
             if rc != 0:
                 logger.error(f"Failed to start warp-svc: {stderr}")
                 return False
 
-            await asyncio.sleep(3)
             await self._ensure_socat()
 
-            for _ in range(30):
-                if await self._is_daemon_responsive():
-                    logger.info("warp-svc is ready")
-                    return await self._configure_warp_proxy()
-                await asyncio.sleep(1)
+            if await self._await_daemon_ready():
+                logger.info("warp-svc is ready")
+                return await self._configure_warp_proxy()
 
             logger.error("Timed out waiting for warp-svc")
             return False
@@ -143,31 +202,64 @@ class OfficialController(WarpBackendController):
             logger.error(f"Error starting proxy services: {e}")
             return False
 
+    async def _await_daemon_ready(self, max_wait: float = 30) -> bool:
+        """Poll warp-svc readiness with adaptive backoff (0.1 s growing to 1 s)"""
+        async def fresh_probe() -> bool:
+            self._probe_cache = None
+            return await self._is_daemon_responsive()
+
+        return await self._await_condition(fresh_probe, max_wait, initial=0.1, max_delay=1.0)
+
     async def _configure_warp_proxy(self) -> bool:
         """Apply WARP configuration for proxy mode"""
         try:
-            if not os.path.exists("/var/lib/cloudflare-warp/reg.json"):
-                logger.info("Registering new WARP account...")
-                await self.execute_command("warp-cli --accept-tos registration delete")
-                await self.execute_command("warp-cli --accept-tos registration new")
-
-            await self.execute_command("warp-cli --accept-tos tunnel protocol set MASQUE")
-            await self.execute_command("warp-cli --accept-tos mode proxy")
-            await self.execute_command("warp-cli --accept-tos proxy port 40001")
+            await self._ensure_registration(clear_stale=True)
+            await self._apply_proxy_settings()
             return True
         except Exception as e:
             logger.error(f"Error configuring WARP proxy: {e}")
             return False
 
 
+    async def _ensure_registration(self, clear_stale: bool = False) -> bool:
+        """Register with WARP unless reg.json is already there.
+
+        A successful `registration new` is remembered, so later checks skip both
+        the stat and the subprocess even before warp-svc has flushed reg.json.
+        """
+        if self._has_registration():
+            return True
+        logger.info("No registration found, registering new WARP account...")
+        if clear_stale:
+            self._forget_registration()
+            await self.execute_command_quiet(_CMD_REGISTRATION_DELETE)
+        if await self.execute_command_quiet(_CMD_REGISTRATION_NEW):
+            self._remember_registration()
+            return True
+        return False
+
+    async def _apply_proxy_settings(self):
+        """Push protocol/mode/port to warp-svc; independent settings, so issued concurrently"""
+        await asyncio.gather(
+            self.execute_command_quiet(_CMD_PROTOCOL_MASQUE),
+            self.execute_command_quiet(_CMD_MODE_PROXY),
+            self.execute_command_quiet(_CMD_PROXY_PORT),
+        )
+
     async def _stop_services(self):
         """Stop all possible services (safe for both modes)"""
         logger.info("Stopping official services...")
         try:
-            await self._run_command("s6-rc -d change socat")
-            await self._run_command("s6-rc -d change warp-svc")
+            # One s6-rc transaction takes both down
+            rc, _, stderr = await self._run_exec(
+                ("s6-rc", "-d", "change", "socat", "warp-svc"), capture_stdout=False
+            )
+            if rc != 0:
+                logger.warning(f"s6-rc could not stop official services: {stderr}")
         except Exception as e:
             logger.error(f"Error stopping services: {e}")
+        finally:
+            self._probe_cache = None
 
     # ------------------------------------------------------------------
     # Auxiliary proxy helpers
@@ -180,7 +272,7 @@ class OfficialController(WarpBackendController):
 
         s6_active = False
         try:
-            rc, stdout, _ = await self._run_command("s6-svstat -o up /run/service/socat")
+            rc, stdout, _ = await self._run_exec(("s6-svstat", "-o", "up", "/run/service/socat"))
             s6_active = rc == 0 and stdout.strip() == "true"
         except Exception:
             pass
@@ -190,47 +282,35 @@ class OfficialController(WarpBackendController):
         if s6_active and port_open:
             return
 
-        # Write updated port into the s6 container environment so the
-        # run script picks it up on next start.
+        # Write updated port into the s6 container environment; the run script
+        # starts under with-contenv, so it picks this up on the next (re)start.
         self._write_s6_env("SOCKS5_PORT", str(self.socks5_port))
 
         logger.info(f"Starting socat service (port {self.socks5_port})...")
         try:
-            await self._run_command("s6-rc -d change socat")
-            await asyncio.sleep(0.3)
-            await self._run_command("s6-rc -u change socat")
-            await asyncio.sleep(1)
-            if not await self._is_port_open(self.socks5_port):
-                logger.warning(f"Socat started but port {self.socks5_port} not listening yet")
-                await asyncio.sleep(2)
+            if s6_active:
+                # Up but on the wrong port: one restart re-reads SOCKS5_PORT
+                await self._run_exec(
+                    ("s6-svc", "-r", "/run/service/socat"), capture_stdout=False, capture_stderr=False
+                )
+            else:
+                await self._run_exec(
+                    ("s6-rc", "-u", "change", "socat"), capture_stdout=False, capture_stderr=False
+                )
+            port = self.socks5_port
+            if not await self._await_condition(lambda: self._is_port_open(port), 3, initial=0.05):
+                logger.warning(f"Socat started but port {port} not listening yet")
         except Exception as e:
             logger.error(f"Error starting socat: {e}")
 
-    @staticmethod
-    def _write_s6_env(key: str, value: str) -> None:
-        """Persist an env var into the s6 container environment store."""
-        env_dir = "/var/run/s6/container_environment"
-        try:
-            os.makedirs(env_dir, exist_ok=True)
-            with open(os.path.join(env_dir, key), "w") as f:
-                f.write(value)
-        except OSError:
-            pass
-
-
     # ------------------------------------------------------------------
     # Connectivity checks
     # ------------------------------------------------------------------
 
     async def is_connected(self) -> bool:
         """Check if WARP is connected"""
-        if not await self._check_daemon_running():
-            return False
-        rc, stdout, _ = await self._run_command("warp-cli --accept-tos status", timeout=3)
-        if rc != 0:
-            return False
-        output = stdout.lower()
-        return "connected" in output and "disconnected" not in output
+        _, connected = await self._probe_state()
+        return connected
 
     # ------------------------------------------------------------------
     # Status
@@ -76,24 +76,26 @@ class UsqueController(WarpBackendController):
 
     async def _connect_proxy(self) -> bool:
         """Start usque SOCKS5 proxy via s6"""
+        # The restart below drops any existing exit; nothing cached survives it
+        self._invalidate_status_cache()
         try:
             logger.info(f"Starting usque service (proxy mode, port {self.socks5_port})...")
             self._write_s6_env("SOCKS5_PORT", str(self.socks5_port))
 
-            # Stop first (idempotent — ok if it wasn't running)
-            await self._run_command("s6-rc -d change usque")
-            await asyncio.sleep(0.5)
-            rc, _, stderr = await self._run_command("s6-rc -u change usque")
+            # Stop first (idempotent — ok if it wasn't running); s6-rc waits for it
+            await self._run_exec(
+                ("s6-rc", "-d", "change", "usque"), capture_stdout=False, capture_stderr=False
+            )
+            rc, _, stderr = await self._run_exec(("s6-rc", "-u", "change", "usque"), capture_stdout=False)
             if rc != 0:
                 logger.error(f"Failed to start usque via s6-rc: {stderr}")
                 return False
 
             logger.info("Waiting for usque proxy to become ready...")
-            for _ in range(15):
-                if await self._is_proxy_connected():
-                    logger.info("usque proxy started successfully")
-                    return True
-                await asyncio.sleep(1)
+            if await self._await_condition(self._is_proxy_connected, 15):
+                self._invalidate_status_cache()
+                logger.info("usque proxy started successfully")
+                return True
 
             logger.error("usque proxy failed to start (timeout)")
             return False
@@ -101,22 +103,13 @@ class UsqueController(WarpBackendController):
             logger.error(f"Failed to start usque proxy: {e}")
             return False
 
-    @staticmethod
-    def _write_s6_env(key: str, value: str) -> None:
-        """Persist an env var into the s6 container environment store."""
-        env_dir = "/var/run/s6/container_environment"
-        try:
-            os.makedirs(env_dir, exist_ok=True)
-            with open(os.path.join(env_dir, key), "w") as f:
-                f.write(value)
-        except OSError:
-            pass
-
     async def disconnect(self) -> bool:
         """Stop usque service"""
         try:
             logger.info("Stopping usque services...")
-            await self._run_command("s6-rc -d change usque")
+            await self._run_exec(
+                ("s6-rc", "-d", "change", "usque"), capture_stdout=False, capture_stderr=False
+            )
             self.process = None
             self._invalidate_status_cache()
             return True
@@ -130,14 +123,20 @@ class UsqueController(WarpBackendController):
 
     async def _is_proxy_connected(self) -> bool:
         """Check if usque SOCKS5 proxy is running"""
-        rc, stdout, _ = await self._run_command("s6-svstat -o up /run/service/usque")
+        rc, stdout, _ = await self._run_exec(("s6-svstat", "-o", "up", "/run/service/usque"))
         if rc != 0 or stdout.strip() != "true":
             return False
         return await self._is_port_open(self.socks5_port)
 
     async def is_connected(self) -> bool:
-        """Check if usque is running"""
-        return await self._is_proxy_connected()
+        """Check if usque is running (memoized for _PROBE_TTL)"""
+        now = asyncio.get_running_loop().time()
+        cached = self._probe_cache
+        if cached is not None and now - cached[0] < self._PROBE_TTL:
+            return cached[1]
+        connected = await self._is_proxy_connected()
+        self._probe_cache = (now, connected)
+        return connected
 
     # ------------------------------------------------------------------
     # Status (Override common method if needed, otherwise use Base)
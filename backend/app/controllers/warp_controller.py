@@ -6,13 +6,22 @@ Automatically selects between usque and official backends based on environment
 import os
 import logging
 import asyncio
+import functools
 import shutil
-from typing import Union
+from typing import Tuple, Union
+from .base_controller import WarpBackendController
 from .usque_controller import UsqueController
 from .official_controller import OfficialController
 
 logger = logging.getLogger(__name__)
 
+
+@functools.lru_cache(maxsize=1)
+def _missing_official_binaries() -> Tuple[str, ...]:
+    """PATH lookup for the official client binaries (resolved once per process)."""
+    return tuple(b for b in ("warp-cli", "warp-svc") if shutil.which(b) is None)
+
+
 class WarpController:
     """Factory class for WARP backend controllers"""
     
@@ -22,7 +31,7 @@ class WarpController:
 
     @classmethod
     def _check_official_available(cls) -> Union[None, str]:
-        missing = [b for b in ("warp-cli", "warp-svc") if shutil.which(b) is None]
+        missing = _missing_official_binaries()
         return f"Official backend unavailable: missing {', '.join(missing)}" if missing else None
     
     @classmethod
@@ -88,23 +97,18 @@ class WarpController:
                     
             except Exception as e:
                 logger.warning(f"Error disconnecting current backend: {e}")
+            await cls._instance.close()
         
         # Ensure SOCKS5 port is released before switching
         port = cls._socks5_port
         logger.info(f"Waiting for port {port} to be released...")
         port_free = False
         for _ in range(30): # Wait up to 15 seconds
-            try:
-                # Use asyncio to check port
-                reader, writer = await asyncio.open_connection('127.0.0.1', port)
-                writer.close()
-                await writer.wait_closed()
-                # Connected means port is busy
-                await asyncio.sleep(0.5)
-            except (ConnectionRefusedError, OSError):
-                # Connection refused means port is free
+            # Listener check only; connecting would hand the old proxy a junk client
+            if not await WarpBackendController._is_port_open(port):
                 port_free = True
                 break
+            await asyncio.sleep(0.5)
         
         if not port_free:
             logger.error(f"Port {port} remains occupied after disconnect limit. Switch aborted.")
@@ -138,6 +142,7 @@ class WarpController:
                 await cls._instance.disconnect()
             except Exception as e:
                 logger.warning(f"Error disconnecting during reset: {e}")
+            await cls._instance.close()
         cls._instance = None
         cls._current_backend = None
 
@@ -1,17 +1,19 @@
 import asyncio
-from contextlib import suppress
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, suppress
 import logging
 import os
-from concurrent.futures import ThreadPoolExecutor
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+import orjson
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
 # New Imports
 from .utils.logger import setup_logging, log_collector
 from .controllers.warp_controller import WarpController
+from .controllers.base_controller import WarpBackendController
 from .controllers.config_controller import ConfigManager
 
 
@@ -33,11 +35,41 @@ auth_handler = AuthHandler.get_instance()
 
 SOCKS5_PORT = config_mgr.socks5_port
 PANEL_PORT = config_mgr.panel_port
+# Shared by asyncio.to_thread / run_in_executor(None) across the whole app
+THREAD_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE", "32"))
 
-# Limit thread pool
-_thread_pool = ThreadPoolExecutor(max_workers=4)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """App startup configuration and background task lifetime."""
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(
+        ThreadPoolExecutor(max_workers=THREAD_POOL_SIZE, thread_name_prefix="lumina")
+    )
+    log_collector.set_loop(loop)
+    logger.info("Event loop configured for log collecting")
 
-app = FastAPI(title="Lumina")
+    try:
+        await asyncio.to_thread(auth_handler.migrate_legacy_password_if_needed)
+    except Exception as e:
+        logger.warning(f"Password migration check failed: {e}")
+
+    logger.info(f"Initializing WARP controller (SOCKS5={SOCKS5_PORT}, Panel={PANEL_PORT})...")
+    controller = WarpController.get_instance(socks5_port=SOCKS5_PORT)
+
+    logger.info("Starting WARP backend...")
+    tasks = [
+        asyncio.create_task(connect_in_background(controller)),
+        asyncio.create_task(auto_update_task()),
+        asyncio.create_task(status_broadcast_loop()),
+    ]
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+app = FastAPI(title="Lumina", lifespan=lifespan)
 
 # CORS
 cors_origins_env = os.getenv("CORS_ALLOW_ORIGINS", "http://localhost:5173,http://127.0.0.1:5173")
@@ -54,38 +86,150 @@ if cors_origins:
 else:
     logger.info("CORS disabled (CORS_ALLOW_ORIGINS is empty)")
 
-# Startup Events
-@app.on_event("startup")
-async def startup_event():
-    """App startup configuration."""
-    loop = asyncio.get_running_loop()
-    log_collector.set_loop(loop)
-    logger.info("Event loop configured for log collecting")
-
-    try:
-        auth_handler.migrate_legacy_password_if_needed()
-    except Exception as e:
-        logger.warning(f"Password migration check failed: {e}")
-
-    logger.info(f"Initializing WARP controller (SOCKS5={SOCKS5_PORT}, Panel={PANEL_PORT})...")
-    controller = WarpController.get_instance(socks5_port=SOCKS5_PORT)
-    
-    logger.info("Starting WARP backend...")
-    asyncio.create_task(connect_in_background(controller))
-    asyncio.create_task(auto_update_task())
-
 # Tasks (kept here or moved to utils/tasks.py - keeping here for simplicity as they tie everything together)
 async def connect_in_background(controller):
     logger.info("Starting WARP backend (background)...")
     await controller.connect()
 
-async def run_blocking(func, *args):
+class ConnectionManager:
+    """Tracks /ws/status clients and fans messages out to all of them.
+
+    Every client gets a bounded queue drained by its own writer task, so a
+    stalled socket only backs up (and then drops) its own frames.
+    """
+
+    QUEUE_SIZE = 256
+    # Message types where only the newest frame matters. They are kept in a
+    # per-client latest-value slot rather than the FIFO: the queue carries just
+    # the type name as a placeholder, and the writer sends whatever is in the
+    # slot when it reaches it. They are never dropped and never evict log frames.
+    LATEST_WINS = frozenset({"status"})
+
+    def __init__(self):
+        self.active_connections: dict[WebSocket, asyncio.Queue] = {}
+        self._writers: dict[WebSocket, asyncio.Task] = {}
+        # Newest pending LATEST_WINS frame per client, by message type
+        self._latest: dict[WebSocket, dict[str, str]] = {}
+        # Copy-on-write snapshot of (client, queue), rebuilt on connect/disconnect
+        self._queues: tuple[tuple[WebSocket, asyncio.Queue], ...] = ()
+        # Frames dropped per client because its queue was full; logged on disconnect
+        self._dropped: dict[WebSocket, int] = {}
+
+    async def connect(self, websocket: WebSocket):
+        await websocket.accept()
+        # Bounded by _enqueue, so the placeholders always fit
+        queue = asyncio.Queue()
+        latest: dict[str, str] = {}
+        self.active_connections[websocket] = queue
+        self._latest[websocket] = latest
+        self._queues = tuple(self.active_connections.items())
+        self._writers[websocket] = asyncio.create_task(self._writer(websocket, queue, latest))
+
+    def disconnect(self, websocket: WebSocket):
+        if self.active_connections.pop(websocket, None) is not None:
+            self._queues = tuple(self.active_connections.items())
+        self._latest.pop(websocket, None)
+        dropped = self._dropped.pop(websocket, 0)
+        if dropped:
+            logger.debug(f"WebSocket client disconnected; {dropped} frames were dropped for it")
+        writer = self._writers.pop(websocket, None)
+        if writer and writer is not asyncio.current_task():
+            writer.cancel()
+
+    async def _writer(self, websocket: WebSocket, queue: asyncio.Queue, latest: dict[str, str]):
+        try:
+            while True:
+                payload = await queue.get()
+                if payload in self.LATEST_WINS:
+                    payload = latest.pop(payload)
+                await websocket.send_text(payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f"WebSocket send failed, dropping client: {e}")
+            self.disconnect(websocket)
+            with suppress(Exception):
+                await websocket.close()
+
+    @staticmethod
+    def encode(message: dict) -> str:
+        # Text frame: the frontend JSON.parses event.data, so no binary frames
+        return orjson.dumps(message).decode()
+
+    def _enqueue(self, websocket: WebSocket, queue: asyncio.Queue, payload: str, msg_type: str = None):
+        if msg_type in self.LATEST_WINS:
+            latest = self._latest.get(websocket)
+            if latest is None:
+                return
+            if msg_type not in latest:
+                queue.put_nowait(msg_type)
+            # A fresh status supersedes a stale one still waiting to be sent
+            latest[msg_type] = payload
+            return
+        if queue.qsize() >= self.QUEUE_SIZE:
+            self._dropped[websocket] = self._dropped.get(websocket, 0) + 1
+            return
+        queue.put_nowait(payload)
+
+    def send(self, websocket: WebSocket, message: dict):
+        """Queue a message for a single client."""
+        queue = self.active_connections.get(websocket)
+        if queue is not None:
+            self._enqueue(websocket, queue, self.encode(message), message.get("type"))
+
+    def broadcast(self, message: dict):
+        """Serialize once and queue the frame for every client; never blocks."""
+        payload = self.encode(message)
+        msg_type = message.get("type")
+        for websocket, queue in self._queues:
+            self._enqueue(websocket, queue, payload, msg_type)
+
+
+manager = ConnectionManager()
+
+# Safety re-poll for state changes nobody signalled (e.g. the proxy process dying)
+STATUS_REFRESH_INTERVAL = 30
+
+async def status_broadcast_loop():
+    """Push status changes and new log entries to websocket clients.
+
+    Status is only re-read when a backend signals a change (or on the safety
+    re-poll), so idle dashboards do not spawn status probes every second.
+    """
+    status_changed = WarpBackendController.status_changed
     loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(_thread_pool, func, *args)
+    last_log_id = log_collector.latest_id
+    last_status = None
+    last_status_at = 0.0
+    while True:
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(status_changed.wait(), timeout=1)
+        if not manager.active_connections:
+            status_changed.clear()
+            last_status = None
+            last_log_id = log_collector.latest_id
+            continue
+        try:
+            now = loop.time()
+            if status_changed.is_set() or now - last_status_at >= STATUS_REFRESH_INTERVAL:
+                status_changed.clear()
+                status = await WarpController.get_instance().get_status()
+                last_status_at = now
+                if status != last_status:
+                    manager.broadcast({"type": "status", "data": status})
+                    last_status = status
+
+            new_logs = log_collector.get_since(last_log_id, limit=500)
+            if new_logs:
+                # One frame per tick rather than one per log line
+                manager.broadcast({"type": "log_batch", "data": new_logs})
+                last_log_id = new_logs[-1]["id"]
+        except Exception as e:
+            logger.debug(f"Status broadcast failed: {e}")
 
 async def auto_update_task():
     try:
-        await run_blocking(KernelVersionManager.get_instance().adopt_system_installation, "usque")
+        await asyncio.to_thread(KernelVersionManager.get_instance().adopt_system_installation, "usque")
     except Exception as e:
         logger.warning(f"Failed to adopt system installation: {e}")
 
@@ -93,7 +237,7 @@ async def auto_update_task():
     # Users can trigger updates manually via the UI.
     # logger.info("Running kernel auto-update check...")
     # try:
-    #     await run_blocking(KernelVersionManager.get_instance().auto_update, "usque")
+    #     await asyncio.to_thread(KernelVersionManager.get_instance().auto_update, "usque")
     # except Exception as e:
     #     logger.error(f"Auto-update failed: {e}")
 
@@ -129,25 +273,22 @@ async def ws_status(websocket: WebSocket):
         await websocket.close(code=1008)
         return
 
-    await websocket.accept()
-    last_log_id = log_collector.latest_id
+    await manager.connect(websocket)
 
     try:
-        while True:
-            status = await WarpController.get_instance().get_status()
-            await websocket.send_json({"type": "status", "data": status})
+        # Initial snapshot; afterwards status_broadcast_loop pushes updates.
+        status = await WarpController.get_instance().get_status()
+        manager.send(websocket, {"type": "status", "data": status})
 
-            new_logs = log_collector.get_since(last_log_id, limit=500)
-            for entry in new_logs:
-                await websocket.send_json({"type": "log", "data": entry})
-                last_log_id = entry["id"]
-
-            await asyncio.sleep(1)
+        # Clients never send anything; reading just waits for the disconnect.
+        while True:
+            await websocket.receive_text()
     except WebSocketDisconnect:
         pass
     except Exception as e:
         logger.debug(f"WebSocket /ws/status closed: {e}")
     finally:
+        manager.disconnect(websocket)
         with suppress(Exception):
             await websocket.close()
 
@@ -160,21 +301,20 @@ if not os.path.exists(STATIC_DIR):
     if os.path.exists(local_static):
         STATIC_DIR = local_static
 
-if os.path.exists(STATIC_DIR):
-    app.mount("/assets", StaticFiles(directory=f"{STATIC_DIR}/assets"), name="assets")
+class SPAStaticFiles(StaticFiles):
+    """Static files with an index.html fallback for client-side (history mode) routes."""
+
+    async def get_response(self, path: str, scope):
+        try:
+            return await super().get_response(path, scope)
+        except StarletteHTTPException as e:
+            if e.status_code != 404 or path.split("/", 1)[0] in ("api", "ws"):
+                raise
+            return await super().get_response("index.html", scope)
+
 
-    @app.get("/")
-    async def read_index():
-        return FileResponse(f'{STATIC_DIR}/index.html')
+if os.path.exists(STATIC_DIR):
+    # Mounted last so every API/WS route above takes precedence
+    app.mount("/", SPAStaticFiles(directory=STATIC_DIR, html=True), name="spa")
 else:
     logger.warning(f"Static files directory {STATIC_DIR} not found. Frontend will not be served.")
-
-@app.get("/{full_path:path}")
-async def serve_spa(full_path: str):
-    if full_path.startswith("api") or full_path.startswith("ws"):
-         raise HTTPException(status_code=404)
-    
-    if os.path.exists(f"{STATIC_DIR}/{full_path}"):
-        return FileResponse(f"{STATIC_DIR}/{full_path}")
-        
-    return FileResponse(f'{STATIC_DIR}/index.html')
@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, Depends, Request, Security, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field
@@ -31,7 +32,7 @@ async def auth_status():
 @router.post("/login")
 async def login(req: LoginRequest, request: Request):
     client_ip = request.client.host if request.client else "unknown"
-    token = auth_handler.authenticate(req.password, client_ip=client_ip)
+    token = await auth_handler.authenticate(req.password, client_ip)
     return {"success": True, "token": token}
 
 @router.get("/sessions")
@@ -49,13 +50,14 @@ async def change_password(
     if not config_mgr.panel_password:
         raise HTTPException(status_code=400, detail="Authentication is disabled")
 
-    if not auth_handler.verify_password(req.current_password):
+    if not await asyncio.to_thread(auth_handler.verify_password, req.current_password):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
 
     if req.current_password == req.new_password:
         raise HTTPException(status_code=400, detail="New password must be different from current password")
 
-    config_mgr.set("panel_password", auth_handler.hash_password(req.new_password))
+    hashed = await asyncio.to_thread(auth_handler.hash_password, req.new_password)
+    config_mgr.set("panel_password", hashed)
 
     current_token = creds.credentials if creds else None
     logged_out_others = auth_handler.revoke_all_tokens(keep_token=current_token)
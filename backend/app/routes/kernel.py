@@ -22,6 +22,14 @@ async def run_blocking(func, *args):
     loop = asyncio.get_running_loop()
     return await loop.run_in_executor(None, func, *args)
 
+async def _gather_version_info(backend: str):
+    """Run the independent version lookups for a backend concurrently."""
+    return await asyncio.gather(
+        run_blocking(kernel_mgr.list_versions, backend),
+        run_blocking(kernel_mgr.get_active_version, backend),
+        run_blocking(kernel_mgr.get_installed_version_info, backend),
+    )
+
 @router.get("/versions")
 async def get_kernel_versions(backend: str = None, user: str = Depends(auth_handler.get_current_user)):
     """List available versions for the specified backend (or current backend)"""
@@ -29,12 +37,7 @@ async def get_kernel_versions(backend: str = None, user: str = Depends(auth_hand
         backend = WarpController.get_current_backend()
     backend = normalize_backend(backend, default="usque")
         
-    versions = await run_blocking(kernel_mgr.list_versions, backend)
-    # Get current active version (configured)
-    current_active = await run_blocking(kernel_mgr.get_active_version, backend)
-    
-    # Get detailed info (installed version, latest version)
-    info = await run_blocking(kernel_mgr.get_installed_version_info, backend)
+    versions, current_active, info = await _gather_version_info(backend)
     
     current = current_active or info.get("version") or "Unknown"
     if current in {"System Default", "Not Installed", "Unknown"} and info.get("version"):
@@ -54,26 +57,30 @@ async def get_all_kernel_versions(user: str = Depends(auth_handler.get_current_u
     """Get version info for all backends"""
     backends = ["usque", "official"]
     results = {}
-    
-    for backend in backends:
-        try:
-            versions = await run_blocking(kernel_mgr.list_versions, backend)
-            current_active = await run_blocking(kernel_mgr.get_active_version, backend)
-            info = await run_blocking(kernel_mgr.get_installed_version_info, backend)
-            current = current_active or info.get("version") or "Unknown"
-            if current in {"System Default", "Not Installed", "Unknown"} and info.get("version"):
-                current = info.get("version")
-            
-            results[backend] = {
-                "versions": versions,
-                "current": current,
-                "installed_version": info.get("version"),
-                "latest_version": info.get("latest_version"),
-                "update_available": info.get("update_available")
-            }
-        except Exception as e:
-            logger.error(f"Error getting info for {backend}: {e}")
-            results[backend] = {"error": str(e)}
+
+    # Each backend's probes fork their own subprocesses; run them side by side.
+    gathered = await asyncio.gather(
+        *(_gather_version_info(backend) for backend in backends),
+        return_exceptions=True,
+    )
+    for backend, outcome in zip(backends, gathered):
+        if isinstance(outcome, Exception):
+            logger.error(f"Error getting info for {backend}: {outcome}")
+            results[backend] = {"error": str(outcome)}
+            continue
+
+        versions, current_active, info = outcome
+        current = current_active or info.get("version") or "Unknown"
+        if current in {"System Default", "Not Installed", "Unknown"} and info.get("version"):
+            current = info.get("version")
+
+        results[backend] = {
+            "versions": versions,
+            "current": current,
+            "installed_version": info.get("version"),
+            "latest_version": info.get("latest_version"),
+            "update_available": info.get("update_available")
+        }
             
     return results
 
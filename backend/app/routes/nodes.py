@@ -14,6 +14,8 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 auth_handler = AuthHandler.get_instance()
 node_mgr = NodeManager.get_instance()
+# Upper bound on remote nodes probed at once by /overview
+OVERVIEW_CONCURRENCY = 8
 
 
 class NodeCreateRequest(BaseModel):
@@ -125,6 +127,7 @@ async def overview(user: str = Depends(auth_handler.get_current_user)):
     remote_nodes = node_mgr.list_nodes()
     raw_nodes = [node_mgr.get_node(node["id"]) for node in remote_nodes]
     raw_nodes = [node for node in raw_nodes if node]
+    semaphore = asyncio.Semaphore(OVERVIEW_CONCURRENCY)
 
     async def fetch_node_status(node: dict):
         if not node.get("enabled", True):
@@ -137,10 +140,11 @@ async def overview(user: str = Depends(auth_handler.get_current_user)):
                 "error": "Node is disabled",
             }
 
-        status_result, version_result = await asyncio.gather(
-            node_mgr.request_remote(node, "GET", "/api/status"),
-            node_mgr.request_remote(node, "GET", "/api/version"),
-        )
+        async with semaphore:
+            status_result, version_result = await asyncio.gather(
+                node_mgr.request_remote(node, "GET", "/api/status"),
+                node_mgr.request_remote(node, "GET", "/api/version"),
+            )
         reachable = bool(status_result.get("ok"))
         version = None
         if version_result.get("ok") and isinstance(version_result.get("data"), dict):
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
@@ -33,7 +34,8 @@ async def initialize_panel(req: SetupRequest):
 
     previous_socks5 = config_mgr.socks5_port
     previous_panel_port = config_mgr.panel_port
-    config_mgr.set("panel_password", auth_handler.hash_password(req.panel_password))
+    hashed = await asyncio.to_thread(auth_handler.hash_password, req.panel_password)
+    config_mgr.set("panel_password", hashed)
     config_mgr.set("socks5_port", int(req.socks5_port or 1080))
     config_mgr.set("panel_port", int(req.panel_port or 8000))
     config_mgr.set("initialized", True)
@@ -1,18 +1,24 @@
 import logging
+import time
 from collections import deque
-from datetime import datetime
+from itertools import islice
 from threading import Lock
 
 # Filter for noisy connection logs
 class ConnectionFilter(logging.Filter):
+    NOISY_PATTERNS = (
+        "connection open",
+        "connection closed",
+        '"websocket /ws/status"',
+    )
+
     def filter(self, record):
-        msg = record.getMessage().lower()
-        noisy_patterns = (
-            "connection open",
-            "connection closed",
-            '"websocket /ws/status"',
-        )
-        return not any(pattern in msg for pattern in noisy_patterns)
+        # Skip the %-formatting pass when there is nothing to interpolate
+        if not record.args and isinstance(record.msg, str):
+            msg = record.msg.lower()
+        else:
+            msg = record.getMessage().lower()
+        return not any(pattern in msg for pattern in self.NOISY_PATTERNS)
 
 class LogCollector(logging.Handler):
     def __init__(self, maxlen=300):
@@ -20,6 +26,8 @@ class LogCollector(logging.Handler):
         self._lock = Lock()
         self._next_id = 1
         self.logs = deque(maxlen=maxlen)
+        # (epoch second, formatted HH:MM:SS); swapped as one tuple so threads never see a torn pair
+        self._ts_cache = (-1, "")
         self.formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             datefmt='%H:%M:%S'
@@ -40,8 +48,14 @@ class LogCollector(logging.Handler):
             if record.exc_text:
                 msg = f"{msg}\n{record.exc_text}"
 
+        second = int(record.created)
+        ts_cache = self._ts_cache
+        if ts_cache[0] != second:
+            ts_cache = (second, time.strftime('%H:%M:%S', time.localtime(second)))
+            self._ts_cache = ts_cache
+
         log_entry = {
-            'timestamp': datetime.fromtimestamp(record.created).strftime('%H:%M:%S'),
+            'timestamp': ts_cache[1],
             'level': record.levelname,
             'logger': record.name,
             'message': msg
@@ -66,13 +80,23 @@ class LogCollector(logging.Handler):
     def get_since(self, since_id: int, limit: int = 500):
         safe_limit = max(1, min(int(limit), 1000))
         with self._lock:
-            items = [entry for entry in self.logs if entry["id"] > since_id]
-            return items[:safe_limit]
+            if not self.logs:
+                return []
+            # IDs are contiguous, so the cursor maps straight to a deque offset
+            start = max(0, since_id - self.logs[0]["id"] + 1)
+            return list(islice(self.logs, start, start + safe_limit))
 
 # Global instance
 log_collector = LogCollector(maxlen=500)
+_connection_filter = ConnectionFilter()
+_configured = False
 
 def setup_logging():
+    global _configured
+    if _configured:
+        return
+    _configured = True
+
     logging.basicConfig(level=logging.INFO, force=True)
 
     # Add collector to root logger
@@ -81,12 +105,11 @@ def setup_logging():
         root_logger.addHandler(log_collector)
 
     # Apply filter to ALL handlers (console + collector)
-    conn_filter = ConnectionFilter()
     for handler in root_logger.handlers:
-        handler.addFilter(conn_filter)
+        handler.addFilter(_connection_filter)
 
     # Suppress noisy frameworks/libraries to improve signal quality
-    logging.getLogger("uvicorn.access").addFilter(conn_filter)
+    logging.getLogger("uvicorn.access").addFilter(_connection_filter)
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
     logging.getLogger("websockets").setLevel(logging.WARNING)
     logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -1,5 +1,7 @@
+import functools
 import os
 
+@functools.lru_cache(maxsize=1)
 def get_app_version():
     """Reads the application version from the VERSION file in the project root."""
     try:
@@ -98,6 +98,8 @@ const connectWebSocket = () => {
                 if (isLoading.value && statusData.value.status === 'connected') {
                      isLoading.value = false;
                 }
+            } else if (message.type === 'log_batch') {
+                appendLogs(message.data);
             } else if (message.type === 'log') {
                 appendLogs([message.data]);
             }
@@ -138,7 +138,7 @@ STATIC_DIR="${PROJECT_ROOT}/backend/static"
 
 cat > /etc/supervisor/conf.d/warppool.conf <<SUPERVISOREOF
 [program:warppool-api]
-command=${VENV_UVICORN} app.main:app --host 0.0.0.0 --port ${PANEL_PORT}
+command=${VENV_UVICORN} app.main:app --host 0.0.0.0 --port ${PANEL_PORT} --loop uvloop --ws-ping-interval 20 --ws-ping-timeout 20
 directory=${BACKEND_DIR}
 user=root
 autostart=true
@@ -178,7 +178,7 @@ stdout_logfile=/dev/null
 priority=10
 
 [program:socat]
-command=/usr/bin/socat TCP-LISTEN:${SOCKS5_PORT},reuseaddr,bind=0.0.0.0,fork TCP:127.0.0.1:40001
+command=/usr/bin/socat TCP-LISTEN:${SOCKS5_PORT},reuseaddr,nodelay,bind=0.0.0.0,fork TCP:127.0.0.1:40001,nodelay
 user=root
 autostart=false
 autorestart=true